@@ -15,10 +15,12 @@ class Settings(BaseSettings):
     # Ollama settings
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.2"  # Default model, can be changed
+    ollama_max_concurrency: int = 2  # Max concurrent generations against Ollama
     
     # API settings
     api_title: str = "Agentic Marketplace Insights API"
     api_version: str = "1.0.0"
+    cors_origins: list = ["http://localhost:3000"]
     
     # Application settings
     debug: bool = False
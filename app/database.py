@@ -2,12 +2,17 @@
 MongoDB database connection and utilities
 """
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
 from app.config import settings
 from typing import Optional
 
 
 class Database:
     client: Optional[AsyncIOMotorClient] = None
+    # Collection handles resolved once at startup so the hot path doesn't
+    # rebuild them from settings on every request
+    products = None
+    insights = None
 
 
 database = Database()
@@ -18,13 +23,32 @@ async def connect_to_mongo():
     database.client = AsyncIOMotorClient(settings.mongodb_url)
     # Test connection
     await database.client.admin.command('ping')
+    db = database.client[settings.mongodb_database]
+    database.products = db.products
+    database.insights = db.insights
+    await create_indexes()
     print("Connected to MongoDB")
 
 
+async def create_indexes():
+    """Create indexes backing the common query patterns"""
+    # get_products filters by marketplace and/or category
+    await database.products.create_indexes([
+        IndexModel([("marketplace", 1), ("category", 1)], background=True),
+        IndexModel([("category", 1)], background=True),
+    ])
+    # get_product_insights filters by product_id and sorts by generated_at desc
+    await database.insights.create_indexes([
+        IndexModel([("product_id", 1), ("generated_at", -1)], background=True),
+    ])
+
+
 async def close_mongo_connection():
     """Close database connection"""
     if database.client:
         database.client.close()
+        database.products = None
+        database.insights = None
         print("Disconnected from MongoDB")
 
 
@@ -0,0 +1,14 @@
+"""
+Shared FastAPI dependencies
+"""
+from fastapi import HTTPException
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def parse_object_id(product_id: str) -> ObjectId:
+    """Parse a path product_id into an ObjectId, rejecting invalid ids with 422"""
+    try:
+        return ObjectId(product_id)
+    except InvalidId:
+        raise HTTPException(status_code=422, detail="Invalid product id")
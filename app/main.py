@@ -7,6 +7,9 @@ from contextlib import asynccontextmanager
 from app.routers import insights, products
 from app.config import settings
 from app.database import connect_to_mongo, close_mongo_connection
+from app.responses import MongoORJSONResponse
+from app.services.ollama_service import ollama_service
+from app.services.product_service import start_insight_writer, stop_insight_writer
 
 
 @asynccontextmanager
@@ -14,8 +17,12 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     await connect_to_mongo()
+    ollama_service.create_client()
+    insight_writer = start_insight_writer()
     yield
     # Shutdown
+    await stop_insight_writer(insight_writer)
+    await ollama_service.close_client()
     await close_mongo_connection()
 
 
@@ -23,16 +30,19 @@ app = FastAPI(
     title="Agentic Marketplace Insights API",
     description="AI-powered product insights using Ollama",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=MongoORJSONResponse
 )
 
-# CORS middleware
+# CORS middleware. Origins are explicit because browsers reject the
+# wildcard together with credentials; max_age lets them cache preflights.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,
 )
 
 # Include routers
@@ -1,7 +1,7 @@
 """
 Product data models
 """
-from pydantic import BaseModel, Field, ConfigDict, BeforeValidator
+from pydantic import BaseModel, Field, ConfigDict, BeforeValidator, computed_field, field_serializer
 from typing import Optional, List, Dict, Any, Annotated
 from datetime import datetime
 from bson import ObjectId
@@ -41,16 +41,30 @@ class ProductCreate(ProductBase):
 class Product(ProductBase):
     """Product model with ID"""
     id: Optional[PyObjectId] = Field(None, alias="_id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @computed_field
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """Creation time derived from the ObjectId's embedded timestamp"""
+        if isinstance(self.id, ObjectId):
+            return self.id.generation_time
+        if isinstance(self.id, str) and ObjectId.is_valid(self.id):
+            return ObjectId(self.id).generation_time
+        return None
+
     model_config = ConfigDict(
         populate_by_name=True,
         arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str},
-        str_strip_whitespace=True
+        str_strip_whitespace=True,
+        defer_build=True
     )
 
+    @field_serializer("id")
+    def _serialize_id(self, v):
+        """Serialize raw ObjectIds (e.g. from model_construct) as strings"""
+        return str(v) if v else None
+
 
 class ProductInsight(BaseModel):
     """Product insight model"""
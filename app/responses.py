@@ -0,0 +1,16 @@
+"""
+Custom response classes for the application
+"""
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+class MongoORJSONResponse(ORJSONResponse):
+    """ORJSON response that serializes ObjectId and other Mongo types via str"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
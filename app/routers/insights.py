@@ -1,12 +1,15 @@
 """
 API routes for product insights
 """
-from fastapi import APIRouter, HTTPException, Depends
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from app.models.product import InsightRequest, ProductInsight
+from app.dependencies import parse_object_id
+from app.responses import MongoORJSONResponse
 from app.services.ollama_service import ollama_service
 from app.services.product_service import product_service
-from app.database import get_database
 from datetime import datetime
 
 router = APIRouter()
@@ -21,7 +24,8 @@ async def generate_insight(request: InsightRequest):
         # Get product information if product_id is provided
         product = None
         if request.product_id:
-            product = await product_service.get_product(request.product_id)
+            oid = parse_object_id(request.product_id)
+            product = await product_service.get_product(oid)
             if not product:
                 raise HTTPException(status_code=404, detail="Product not found")
         
@@ -45,35 +49,86 @@ async def generate_insight(request: InsightRequest):
                 generated_at=datetime.utcnow(),
                 metadata=insight_data.get("metadata")
             )
-            await product_service.save_insight(insight)
+            # Queued for batched background insertion; the response
+            # doesn't wait on the Mongo write
+            await product_service.queue_insight(insight)
         
         return {
             "success": True,
             "insight": insight_data,
             "product_id": request.product_id
         }
-    
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating insight: {str(e)}")
 
 
+@router.post("/insights/generate/stream")
+async def generate_insight_stream(request: InsightRequest):
+    """
+    Stream AI-powered insights for a product as they are generated
+    """
+    # Get product information if product_id is provided
+    product = None
+    if request.product_id:
+        oid = parse_object_id(request.product_id)
+        product = await product_service.get_product(oid)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+
+    stream = ollama_service.stream_product_insight(
+        product_name=request.product_name or (product.name if product else "Unknown Product"),
+        product_description=product.description if product else None,
+        category=product.category if product else None,
+        price=product.price if product else None,
+        marketplace=product.marketplace if product else None,
+        insight_type=request.insight_type,
+        context=request.context
+    )
+    return StreamingResponse(stream, media_type="text/event-stream")
+
+
 @router.get("/insights/product/{product_id}")
-async def get_product_insights(product_id: str):
+async def get_product_insights(
+    product_id: str,
+    limit: int = Query(50, ge=1, le=500)
+):
     """
-    Get all insights for a specific product
+    Get the most recent insights for a specific product
     """
     try:
-        insights = await product_service.get_product_insights(product_id)
-        return {
+        insights = await product_service.get_product_insights(product_id, limit=limit)
+        # Returned as a Response instance so FastAPI skips jsonable_encoder,
+        # which chokes on the raw ObjectId _id; render's default=str handles it
+        return MongoORJSONResponse({
             "success": True,
             "product_id": product_id,
             "insights": insights,
             "count": len(insights)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching insights: {str(e)}")
 
 
+@router.get("/insights/product/{product_id}/stream")
+async def stream_product_insights(
+    product_id: str,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Stream a product's most recent insights as NDJSON
+    """
+    cursor = product_service.insights_cursor(product_id, limit=limit)
+
+    async def generate():
+        async for insight in cursor:
+            yield orjson.dumps(insight, default=str) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.post("/insights/compare")
 async def compare_products(products: list):
     """
@@ -1,76 +1,93 @@
 """
 API routes for product management
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional, List
+from bson import ObjectId
+from pydantic import TypeAdapter
+from app.dependencies import parse_object_id
 from app.models.product import Product, ProductCreate
+from app.responses import MongoORJSONResponse
 from app.services.product_service import product_service
 
 router = APIRouter()
 
+# Built once at import; serializing through the adapter avoids the
+# per-item dispatch of the generic response_model machinery
+_PRODUCTS_ADAPTER = TypeAdapter(List[Product])
 
-@router.post("/products", response_model=Product)
+
+def _product_response(product: Product) -> MongoORJSONResponse:
+    """Serialize a product directly, skipping response_model revalidation"""
+    return MongoORJSONResponse(product.model_dump(mode="json", by_alias=True))
+
+
+@router.post("/products", responses={200: {"model": Product}})
 async def create_product(product: ProductCreate):
     """
     Create a new product
     """
     try:
         created_product = await product_service.create_product(product)
-        return created_product
+        return _product_response(created_product)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating product: {str(e)}")
 
 
-@router.get("/products", response_model=List[Product])
+@router.get("/products", responses={200: {"model": List[Product]}})
 async def get_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     marketplace: Optional[str] = None,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
 ):
     """
-    Get list of products with optional filters
+    Get list of products with optional filters and field projection
     """
     try:
         products = await product_service.get_products(
             skip=skip,
             limit=limit,
             marketplace=marketplace,
-            category=category
+            category=category,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        )
+        return MongoORJSONResponse(
+            _PRODUCTS_ADAPTER.dump_python(products, by_alias=True, mode="json")
         )
-        return products
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
 
 
-@router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str):
+@router.get("/products/{product_id}", responses={200: {"model": Product}})
+async def get_product(oid: ObjectId = Depends(parse_object_id)):
     """
     Get a specific product by ID
     """
-    product = await product_service.get_product(product_id)
+    product = await product_service.get_product(oid)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return _product_response(product)
 
 
-@router.put("/products/{product_id}", response_model=Product)
-async def update_product(product_id: str, product_update: dict):
+@router.put("/products/{product_id}", responses={200: {"model": Product}})
+async def update_product(product_update: dict, oid: ObjectId = Depends(parse_object_id)):
     """
     Update a product
     """
-    updated_product = await product_service.update_product(product_id, product_update)
+    updated_product = await product_service.update_product(oid, product_update)
     if not updated_product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return updated_product
+    return _product_response(updated_product)
 
 
 @router.delete("/products/{product_id}")
-async def delete_product(product_id: str):
+async def delete_product(oid: ObjectId = Depends(parse_object_id)):
     """
     Delete a product
     """
-    success = await product_service.delete_product(product_id)
+    success = await product_service.delete_product(oid)
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
     return {"success": True, "message": "Product deleted successfully"}
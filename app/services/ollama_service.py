@@ -1,38 +1,143 @@
 """
 Ollama service for AI-powered insights generation
 """
+import asyncio
+import hashlib
+import io
+import time
 import httpx
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Dict, Any
 from app.config import settings
 import json
 
+# Completed generations are cached by content hash for this long (seconds)
+_INSIGHT_CACHE_TTL = 3600.0
+_INSIGHT_CACHE_MAX_SIZE = 1024
+
+# Prompt templates by insight type, built once at import. Each template
+# only needs the product context filled in at request time.
+_PROMPTS: Dict[str, str] = {
+    "trend_analysis": """Analyze the following product and provide trend insights:
+
+{context}
+
+Please provide:
+1. Current market trends for this product
+2. Demand indicators
+3. Seasonal patterns (if applicable)
+4. Growth potential
+5. Key recommendations""",
+    "pricing_insight": """Analyze the pricing strategy for this product:
+
+{context}
+
+Please provide:
+1. Price competitiveness analysis
+2. Optimal pricing recommendations
+3. Price positioning in the market
+4. Discount opportunities
+5. Value proposition assessment""",
+    "competitor_analysis": """Analyze competitors for this product:
+
+{context}
+
+Please provide:
+1. Competitive landscape overview
+2. Key differentiators
+3. Competitive advantages and disadvantages
+4. Market positioning
+5. Strategic recommendations""",
+    "general": """Provide comprehensive insights about this product:
+
+{context}
+
+Please provide:
+1. Market overview
+2. Key strengths and opportunities
+3. Potential challenges
+4. Recommendations for success
+5. Actionable next steps""",
+}
+
 
 class OllamaService:
     """Service for interacting with Ollama API"""
-    
+
     def __init__(self):
         self.base_url = settings.ollama_base_url
         self.model = settings.ollama_model
-    
-    async def generate_insight(
+        # Shared HTTP client, created in the application lifespan so
+        # connections to Ollama are pooled and kept alive across requests
+        self.client: Optional[httpx.AsyncClient] = None
+        # Bounds concurrent generations so bursts don't thrash the model server
+        self._semaphore = asyncio.Semaphore(settings.ollama_max_concurrency)
+        # Content-addressed cache of completed generations: hash -> (expiry, text)
+        self._insight_cache: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _cache_key(model: str, system_prompt: Optional[str], prompt: str) -> str:
+        """Content hash identifying a generation request"""
+        return hashlib.sha256(f"{model}|{system_prompt}|{prompt}".encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Return a cached generation if present and not expired"""
+        entry = self._insight_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _cache_set(self, key: str, value: str):
+        """Cache a completed generation, keeping the cache within its cap"""
+        if len(self._insight_cache) >= _INSIGHT_CACHE_MAX_SIZE:
+            now = time.monotonic()
+            self._insight_cache = {
+                k: v for k, v in self._insight_cache.items() if v[0] > now
+            }
+            # Still full after sweeping expired entries: evict the entry
+            # closest to expiry so the cap is a real bound
+            if len(self._insight_cache) >= _INSIGHT_CACHE_MAX_SIZE:
+                oldest = min(self._insight_cache, key=lambda k: self._insight_cache[k][0])
+                del self._insight_cache[oldest]
+        self._insight_cache[key] = (time.monotonic() + _INSIGHT_CACHE_TTL, value)
+
+    def create_client(self) -> httpx.AsyncClient:
+        """Create the shared HTTP client (called at application startup)"""
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(120.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=30.0
+            )
+        )
+        return self.client
+
+    async def close_client(self):
+        """Close the shared HTTP client (called at application shutdown)"""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def stream_insight(
         self,
         prompt: str,
         model: Optional[str] = None,
         system_prompt: Optional[str] = None
-    ) -> str:
+    ) -> AsyncIterator[str]:
         """
-        Generate insight using Ollama
-        
+        Stream insight tokens from Ollama as they are generated
+
         Args:
             prompt: User prompt
             model: Model name (optional, uses default if not provided)
             system_prompt: System prompt for context (optional)
-        
-        Returns:
-            Generated insight text
+
+        Yields:
+            Generated text chunks
         """
         model = model or self.model
-        
+
         messages = []
         if system_prompt:
             messages.append({
@@ -43,24 +148,69 @@ class OllamaService:
             "role": "user",
             "content": prompt
         })
-        
-        async with httpx.AsyncClient(timeout=120.0) as client:
+
+        # The semaphore is held for the whole generation: every call path
+        # into Ollama funnels through here, so bursts queue instead of
+        # fanning out into simultaneous generations that thrash the server
+        async with self._semaphore:
             try:
-                response = await client.post(
-                    f"{self.base_url}/api/chat",
+                async with self.client.stream(
+                    "POST",
+                    "/api/chat",
                     json={
                         "model": model,
                         "messages": messages,
-                        "stream": False
+                        "stream": True
                     }
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result.get("message", {}).get("content", "")
+                ) as response:
+                    response.raise_for_status()
+                    # Ollama streams one JSON object per line (NDJSON)
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        content = chunk.get("message", {}).get("content", "")
+                        if content:
+                            yield content
+                        if chunk.get("done"):
+                            break
             except httpx.HTTPError as e:
                 raise Exception(f"Error calling Ollama API: {str(e)}")
+
+    async def generate_insight(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None
+    ) -> str:
+        """
+        Generate insight using Ollama
+
+        Args:
+            prompt: User prompt
+            model: Model name (optional, uses default if not provided)
+            system_prompt: System prompt for context (optional)
+
+        Returns:
+            Generated insight text
+        """
+        cache_key = self._cache_key(model or self.model, system_prompt, prompt)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        chunks = [
+            chunk async for chunk in self.stream_insight(
+                prompt=prompt,
+                model=model,
+                system_prompt=system_prompt
+            )
+        ]
+        insight = "".join(chunks)
+        self._cache_set(cache_key, insight)
+        return insight
     
-    async def generate_product_insight(
+    def _build_product_prompt(
         self,
         product_name: str,
         product_description: Optional[str] = None,
@@ -69,10 +219,10 @@ class OllamaService:
         marketplace: Optional[str] = None,
         insight_type: str = "general",
         context: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> tuple:
         """
-        Generate product-specific insights
-        
+        Build the (system_prompt, prompt) pair for a product insight
+
         Args:
             product_name: Name of the product
             product_description: Product description
@@ -81,90 +231,100 @@ class OllamaService:
             marketplace: Marketplace name
             insight_type: Type of insight to generate
             context: Additional context
-        
+
         Returns:
-            Dictionary containing insight data
+            Tuple of (system_prompt, prompt)
         """
-        system_prompt = """You are an expert market analyst specializing in e-commerce and marketplace insights. 
+        system_prompt = """You are an expert market analyst specializing in e-commerce and marketplace insights.
         Your role is to provide actionable, data-driven insights about products in online marketplaces.
         Be concise, specific, and focus on actionable recommendations."""
-        
-        # Build context for the prompt
-        context_parts = [f"Product: {product_name}"]
-        
-        if product_description:
-            context_parts.append(f"Description: {product_description}")
-        if category:
-            context_parts.append(f"Category: {category}")
-        if price:
-            context_parts.append(f"Price: ${price:.2f}")
-        if marketplace:
-            context_parts.append(f"Marketplace: {marketplace}")
-        if context:
-            context_parts.append(f"Additional Context: {context}")
-        
-        context_text = "\n".join(context_parts)
-        
-        # Generate insight based on type
-        if insight_type == "trend_analysis":
-            prompt = f"""Analyze the following product and provide trend insights:
-            
-{context_text}
 
-Please provide:
-1. Current market trends for this product
-2. Demand indicators
-3. Seasonal patterns (if applicable)
-4. Growth potential
-5. Key recommendations"""
-        
-        elif insight_type == "pricing_insight":
-            prompt = f"""Analyze the pricing strategy for this product:
-            
-{context_text}
+        # Build context for the prompt in one pass
+        context_text = "\n".join(filter(None, [
+            f"Product: {product_name}",
+            f"Description: {product_description}" if product_description else None,
+            f"Category: {category}" if category else None,
+            f"Price: ${price:.2f}" if price else None,
+            f"Marketplace: {marketplace}" if marketplace else None,
+            f"Additional Context: {context}" if context else None,
+        ]))
 
-Please provide:
-1. Price competitiveness analysis
-2. Optimal pricing recommendations
-3. Price positioning in the market
-4. Discount opportunities
-5. Value proposition assessment"""
-        
-        elif insight_type == "competitor_analysis":
-            prompt = f"""Analyze competitors for this product:
-            
-{context_text}
+        template = _PROMPTS.get(insight_type, _PROMPTS["general"])
+        return system_prompt, template.format(context=context_text)
 
-Please provide:
-1. Competitive landscape overview
-2. Key differentiators
-3. Competitive advantages and disadvantages
-4. Market positioning
-5. Strategic recommendations"""
-        
-        else:  # general
-            prompt = f"""Provide comprehensive insights about this product:
-            
-{context_text}
+    def stream_product_insight(
+        self,
+        product_name: str,
+        product_description: Optional[str] = None,
+        category: Optional[str] = None,
+        price: Optional[float] = None,
+        marketplace: Optional[str] = None,
+        insight_type: str = "general",
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream product-specific insight text as it is generated
+
+        Takes the same arguments as generate_product_insight but yields
+        text chunks instead of returning the full insight payload.
+        """
+        system_prompt, prompt = self._build_product_prompt(
+            product_name=product_name,
+            product_description=product_description,
+            category=category,
+            price=price,
+            marketplace=marketplace,
+            insight_type=insight_type,
+            context=context
+        )
+        return self.stream_insight(prompt=prompt, system_prompt=system_prompt)
+
+    async def generate_product_insight(
+        self,
+        product_name: str,
+        product_description: Optional[str] = None,
+        category: Optional[str] = None,
+        price: Optional[float] = None,
+        marketplace: Optional[str] = None,
+        insight_type: str = "general",
+        context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate product-specific insights
+
+        Args:
+            product_name: Name of the product
+            product_description: Product description
+            category: Product category
+            price: Product price
+            marketplace: Marketplace name
+            insight_type: Type of insight to generate
+            context: Additional context
+
+        Returns:
+            Dictionary containing insight data
+        """
+        system_prompt, prompt = self._build_product_prompt(
+            product_name=product_name,
+            product_description=product_description,
+            category=category,
+            price=price,
+            marketplace=marketplace,
+            insight_type=insight_type,
+            context=context
+        )
 
-Please provide:
-1. Market overview
-2. Key strengths and opportunities
-3. Potential challenges
-4. Recommendations for success
-5. Actionable next steps"""
-        
         insight_content = await self.generate_insight(
             prompt=prompt,
             system_prompt=system_prompt
         )
-        
+
         return {
             "insight_type": insight_type,
             "insight_content": insight_content,
             "product_name": product_name,
             "metadata": {
-                "model_used": model,
+                "model_used": self.model,
                 "category": category,
                 "price": price,
                 "marketplace": marketplace
@@ -186,20 +346,41 @@ Please provide:
         Returns:
             Comparison analysis text
         """
-        system_prompt = """You are an expert product comparison analyst. 
+        system_prompt = """You are an expert product comparison analyst.
         Provide detailed, objective comparisons between products."""
-        
-        products_text = "\n\n".join([
-            f"Product {i+1}:\n" + "\n".join([f"{k}: {v}" for k, v in product.items()])
-            for i, product in enumerate(products)
-        ])
-        
+
+        summary_system_prompt = """You are an expert product analyst.
+        Summarize products neutrally, accurately and concisely."""
+
+        def format_details(product: dict) -> str:
+            # Single growable buffer instead of per-field throwaway strings
+            buf = io.StringIO()
+            buf.write("Write a one-paragraph neutral summary of this product:\n\n")
+            for key, value in product.items():
+                buf.write(f"{key}: {value}\n")
+            return buf.getvalue()
+
+        async def summarize(index: int, product: dict) -> str:
+            # Concurrency is bounded inside stream_insight
+            summary = await self.generate_insight(
+                prompt=format_details(product),
+                system_prompt=summary_system_prompt
+            )
+            return f"Product {index + 1} summary:\n{summary}"
+
+        # Summarize products concurrently, then synthesize one comparison.
+        # Wall-time is bounded by the slowest summary instead of their sum.
+        summaries = await asyncio.gather(
+            *[summarize(i, product) for i, product in enumerate(products)]
+        )
+        summaries_text = "\n\n".join(summaries)
+
         aspects = comparison_aspects or ["price", "features", "quality", "value"]
         aspects_text = ", ".join(aspects)
-        
+
         prompt = f"""Compare the following products focusing on: {aspects_text}
 
-{products_text}
+{summaries_text}
 
 Please provide:
 1. Side-by-side comparison
@@ -207,7 +388,7 @@ Please provide:
 3. Best value recommendation
 4. Target audience for each product
 5. Final recommendation"""
-        
+
         return await self.generate_insight(
             prompt=prompt,
             system_prompt=system_prompt
@@ -215,14 +396,13 @@ Please provide:
     
     async def list_available_models(self) -> list:
         """List available Ollama models"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(f"{self.base_url}/api/tags")
-                response.raise_for_status()
-                result = response.json()
-                return [model["name"] for model in result.get("models", [])]
-            except httpx.HTTPError as e:
-                raise Exception(f"Error fetching Ollama models: {str(e)}")
+        try:
+            response = await self.client.get("/api/tags", timeout=30.0)
+            response.raise_for_status()
+            result = response.json()
+            return [model["name"] for model in result.get("models", [])]
+        except httpx.HTTPError as e:
+            raise Exception(f"Error fetching Ollama models: {str(e)}")
 
 
 # Singleton instance
@@ -1,12 +1,112 @@
 """
 Product service for database operations
 """
-from typing import List, Optional
-from app.database import get_database
+import asyncio
+import time
+from typing import Dict, List, Optional
+from pydantic import TypeAdapter
+from app.database import database
 from app.models.product import Product, ProductCreate, ProductInsight
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 
+# Built once at import so list reads skip per-item model __init__ dispatch
+_PRODUCT_LIST_ADAPTER = TypeAdapter(List[Product])
+
+# Short-lived cache for single-product reads on the insight hot path:
+# id -> (expiry, Product). Writes invalidate their entry.
+_PRODUCT_CACHE_TTL = 30.0
+_PRODUCT_CACHE_MAX_SIZE = 4096
+_product_cache: Dict[str, tuple] = {}
+
+# Insight writes are queued and flushed in batches by a background task
+# so requests don't wait on the Mongo insert.
+_INSIGHT_FLUSH_INTERVAL = 0.25
+_INSIGHT_FLUSH_BATCH_SIZE = 50
+_insight_queue: Optional[asyncio.Queue] = None
+
+
+async def _flush_insight_buffer(buffer: List[ProductInsight]):
+    """Insert buffered insights in one batch"""
+    try:
+        await database.insights.insert_many(
+            [insight.model_dump() for insight in buffer],
+            ordered=False
+        )
+    except Exception as e:
+        print(f"Error flushing insights: {e}")
+    buffer.clear()
+
+
+async def _insight_writer_loop(queue: asyncio.Queue):
+    """Drain the insight queue, flushing on batch size or idle timeout
+
+    Exits when it dequeues the None sentinel put by stop_insight_writer.
+    Shutdown deliberately avoids task cancellation: on Python <= 3.11,
+    wait_for can swallow a cancel that races with a completed get(),
+    leaving the loop (and the application lifespan) hanging.
+    """
+    buffer: List[ProductInsight] = []
+    try:
+        while True:
+            try:
+                insight = await asyncio.wait_for(
+                    queue.get(), timeout=_INSIGHT_FLUSH_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                # Idle: flush whatever accumulated
+                if buffer:
+                    await _flush_insight_buffer(buffer)
+                continue
+            if insight is None:
+                # Shutdown sentinel: flush and exit
+                if buffer:
+                    await _flush_insight_buffer(buffer)
+                return
+            buffer.append(insight)
+            if len(buffer) >= _INSIGHT_FLUSH_BATCH_SIZE:
+                await _flush_insight_buffer(buffer)
+    except asyncio.CancelledError:
+        if buffer:
+            await _flush_insight_buffer(buffer)
+        raise
+
+
+def start_insight_writer() -> asyncio.Task:
+    """Start the background insight writer (called at application startup)"""
+    global _insight_queue
+    _insight_queue = asyncio.Queue()
+    return asyncio.create_task(_insight_writer_loop(_insight_queue))
+
+
+async def stop_insight_writer(task: asyncio.Task):
+    """Stop the writer and flush anything still queued (application shutdown)"""
+    global _insight_queue
+    queue = _insight_queue
+    # New queue_insight calls fall back to inline saves from here on
+    _insight_queue = None
+    if queue is None:
+        return
+    # The sentinel lands behind any queued insights, so the loop flushes
+    # them all before exiting. Cancellation is only a last resort.
+    await queue.put(None)
+    try:
+        await asyncio.wait_for(task, timeout=5.0)
+    except asyncio.TimeoutError:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    remaining = []
+    while not queue.empty():
+        insight = queue.get_nowait()
+        if insight is not None:
+            remaining.append(insight)
+    if remaining:
+        await _flush_insight_buffer(remaining)
+
 
 class ProductService:
     """Service for product database operations"""
@@ -14,22 +114,39 @@ class ProductService:
     @staticmethod
     async def create_product(product: ProductCreate) -> Product:
         """Create a new product"""
-        db = get_database()
         product_dict = product.model_dump()
-        product_dict["created_at"] = datetime.utcnow()
+        # created_at is not stored; it is derived from the ObjectId timestamp
         product_dict["updated_at"] = datetime.utcnow()
         
-        result = await db.products.insert_one(product_dict)
-        created_product = await db.products.find_one({"_id": result.inserted_id})
-        return Product(**created_product)
+        result = await database.products.insert_one(product_dict)
+        created_product = await database.products.find_one({"_id": result.inserted_id})
+        # Trusted read of the document we just validated and wrote
+        return Product.model_construct(**created_product)
     
     @staticmethod
-    async def get_product(product_id: str) -> Optional[Product]:
+    async def get_product(product_id: ObjectId) -> Optional[Product]:
         """Get a product by ID"""
-        db = get_database()
-        product = await db.products.find_one({"_id": ObjectId(product_id)})
+        cache_key = str(product_id)
+        entry = _product_cache.get(cache_key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        product = await database.products.find_one({"_id": product_id})
         if product:
-            return Product(**product)
+            # Trusted read: skip revalidation of data we just stored
+            result = Product.model_construct(**product)
+            if len(_product_cache) >= _PRODUCT_CACHE_MAX_SIZE:
+                now = time.monotonic()
+                expired = [k for k, v in _product_cache.items() if v[0] <= now]
+                for key in expired:
+                    _product_cache.pop(key, None)
+                # Still full after sweeping expired entries: evict the
+                # entry closest to expiry so the cap is a real bound
+                if len(_product_cache) >= _PRODUCT_CACHE_MAX_SIZE:
+                    oldest = min(_product_cache, key=lambda k: _product_cache[k][0])
+                    _product_cache.pop(oldest, None)
+            _product_cache[cache_key] = (time.monotonic() + _PRODUCT_CACHE_TTL, result)
+            return result
         return None
     
     @staticmethod
@@ -37,59 +154,85 @@ class ProductService:
         skip: int = 0,
         limit: int = 100,
         marketplace: Optional[str] = None,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> List[Product]:
-        """Get products with optional filters"""
-        db = get_database()
+        """Get products with optional filters and field projection"""
         query = {}
-        
+
         if marketplace:
             query["marketplace"] = marketplace
         if category:
             query["category"] = category
-        
-        cursor = db.products.find(query).skip(skip).limit(limit)
+
+        projection = None
+        if fields:
+            projection = {field: 1 for field in fields}
+            # Required model fields must always be present
+            projection["name"] = 1
+            projection["marketplace"] = 1
+
+        cursor = database.products.find(query, projection).skip(skip).limit(limit)
         products = await cursor.to_list(length=limit)
-        return [Product(**product) for product in products]
+        return _PRODUCT_LIST_ADAPTER.validate_python(products, strict=False)
     
     @staticmethod
-    async def update_product(product_id: str, product_update: dict) -> Optional[Product]:
+    async def update_product(product_id: ObjectId, product_update: dict) -> Optional[Product]:
         """Update a product"""
-        db = get_database()
+        _product_cache.pop(str(product_id), None)
         product_update["updated_at"] = datetime.utcnow()
-        
-        result = await db.products.update_one(
-            {"_id": ObjectId(product_id)},
-            {"$set": product_update}
+
+        # Single round trip: update and fetch the new document atomically.
+        # Also returns the document on no-op updates, where the old
+        # modified_count check wrongly produced a 404.
+        updated_product = await database.products.find_one_and_update(
+            {"_id": product_id},
+            {"$set": product_update},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count:
-            updated_product = await db.products.find_one({"_id": ObjectId(product_id)})
-            return Product(**updated_product)
+        if updated_product:
+            return Product.model_construct(**updated_product)
         return None
     
     @staticmethod
-    async def delete_product(product_id: str) -> bool:
+    async def delete_product(product_id: ObjectId) -> bool:
         """Delete a product"""
-        db = get_database()
-        result = await db.products.delete_one({"_id": ObjectId(product_id)})
+        _product_cache.pop(str(product_id), None)
+        result = await database.products.delete_one({"_id": product_id})
         return result.deleted_count > 0
     
     @staticmethod
     async def save_insight(insight: ProductInsight) -> dict:
         """Save a product insight"""
-        db = get_database()
         insight_dict = insight.model_dump()
-        result = await db.insights.insert_one(insight_dict)
+        result = await database.insights.insert_one(insight_dict)
         return {"id": str(result.inserted_id), **insight_dict}
     
     @staticmethod
-    async def get_product_insights(product_id: str) -> List[dict]:
-        """Get all insights for a product"""
-        db = get_database()
-        cursor = db.insights.find({"product_id": product_id}).sort("generated_at", -1)
-        insights = await cursor.to_list(length=100)
-        return insights
+    async def queue_insight(insight: ProductInsight):
+        """Queue an insight for batched background insertion"""
+        if _insight_queue is None:
+            # Writer not running (e.g. outside the app lifespan): write inline
+            await ProductService.save_insight(insight)
+            return
+        _insight_queue.put_nowait(insight)
+
+    @staticmethod
+    def insights_cursor(product_id: str, limit: int = 50):
+        """Cursor over a product's most recent insights, decoded in batches"""
+        return (
+            database.insights.find({"product_id": product_id})
+            .sort("generated_at", -1)
+            .batch_size(64)
+            .limit(limit)
+        )
+
+    @staticmethod
+    async def get_product_insights(product_id: str, limit: int = 50) -> List[dict]:
+        """Get the most recent insights for a product"""
+        # async iteration yields to the event loop between Mongo batches
+        # instead of decoding the whole result set in one to_list call
+        return [insight async for insight in ProductService.insights_cursor(product_id, limit)]
 
 
 product_service = ProductService()
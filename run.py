@@ -1,13 +1,21 @@
 """
 Simple script to run the FastAPI application
 """
+import os
+
+import uvloop
+uvloop.install()
+
 import uvicorn
 
 if __name__ == "__main__":
+    # reload is incompatible with multiple workers; use
+    # `uvicorn app.main:app --reload` directly during development
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count()
     )
-